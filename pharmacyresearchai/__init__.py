@@ -0,0 +1,3 @@
+"""
+Azure AI agent scripts for pharmacy research. Run `python -m pharmacyresearchai --help`.
+"""
@@ -0,0 +1,112 @@
+"""
+Azure resources shared by the agent scripts.
+
+The credential is created once per process so the DefaultAzureCredential probe
+chain runs only once and its cached token is reused by every client.
+"""
+import asyncio
+import contextlib
+import functools
+
+# uvloop is optional (and unavailable on Windows); fall back to the default event loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Scope used by the Azure AI agent service clients
+TOKEN_SCOPE = "https://management.azure.com/.default"
+
+# Background cleanup tasks (e.g. thread deletion) still in flight
+_PENDING_CLEANUP: set[asyncio.Future] = set()
+
+
+@functools.cache
+def azure_sdk():
+    """
+    Import the Azure SDK on first use and return (AIProjectClient, AzureAIAgent,
+    AzureAIAgentSettings). These imports pull in hundreds of modules, so
+    deferring them keeps interpreter start-up fast when they are not needed.
+    """
+    from azure.ai.projects import AIProjectClient
+    from semantic_kernel.agents.azure_ai import AzureAIAgent, AzureAIAgentSettings
+
+    return AIProjectClient, AzureAIAgent, AzureAIAgentSettings
+
+
+@functools.cache
+def get_credential():
+    """
+    Return the process-wide credential, creating it on first use.
+    Interactive probes are excluded since these scripts run unattended.
+    """
+    from azure.identity.aio import DefaultAzureCredential
+
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+    )
+
+
+async def warm_credential() -> None:
+    """
+    Acquire a token up front so concurrent first calls do not each trigger
+    their own token request.
+    """
+    await get_credential().get_token(TOKEN_SCOPE)
+
+
+async def close_credential() -> None:
+    """
+    Close the shared credential; the next get_credential() creates a new one.
+    """
+    if get_credential.cache_info().currsize:
+        await get_credential().close()
+        get_credential.cache_clear()
+
+
+def schedule_cleanup(aw) -> None:
+    """
+    Run a cleanup awaitable in the background so the caller does not wait on
+    teardown round-trips after the user already has their answer.
+    """
+    task = asyncio.ensure_future(aw)
+    _PENDING_CLEANUP.add(task)
+    task.add_done_callback(_PENDING_CLEANUP.discard)
+
+
+async def drain_cleanup() -> None:
+    """
+    Wait for all background cleanup tasks. Await this before closing the
+    client the cleanup tasks use.
+    """
+    while _PENDING_CLEANUP:
+        for result in await asyncio.gather(*_PENDING_CLEANUP, return_exceptions=True):
+            if isinstance(result, Exception):
+                print(f"❌ Error during cleanup: {result}")
+
+
+@contextlib.asynccontextmanager
+async def shared_credential():
+    """
+    Yield the shared credential without closing it on exit, so it can be used
+    in place of `DefaultAzureCredential() as creds` in an async with block.
+    """
+    yield get_credential()
+
+
+def run_main(main_coro) -> None:
+    """
+    Run a script's main coroutine, on uvloop when available, and close the
+    shared credential afterwards.
+    """
+    async def runner():
+        try:
+            await main_coro
+        finally:
+            await close_credential()
+
+    if uvloop is not None:
+        uvloop.run(runner())
+    else:
+        asyncio.run(runner())
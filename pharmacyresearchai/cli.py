@@ -0,0 +1,133 @@
+"""
+Single entrypoint for the agent scripts:
+
+    python -m pharmacyresearchai create
+    python -m pharmacyresearchai existing
+    python -m pharmacyresearchai multi [QUERIES_FILE]
+    python -m pharmacyresearchai serve [--host HOST] [--port PORT]
+
+Every command in a process runs against one SharedContext, so the agent client
+(and with it the shared credential, SERP HTTP client, agent definition and
+thread caches) stays warm across operations when the process is long-running.
+"""
+import argparse
+import contextlib
+from dataclasses import dataclass
+
+from . import ai_agent_create, ai_agent_existing, multi_agent
+from ._azure_shared import azure_sdk, close_credential, drain_cleanup, get_credential, run_main, warm_credential
+
+
+@dataclass
+class SharedContext:
+    agent_client: object
+
+
+@contextlib.asynccontextmanager
+async def open_shared_context():
+    """
+    Build the SharedContext once, and release its resources (including any
+    cached conversation threads) on exit.
+    """
+    _, AzureAIAgent, _ = azure_sdk()
+    credential = get_credential()
+    await warm_credential()
+    async with AzureAIAgent.create_client(credential=credential) as client:
+        try:
+            yield SharedContext(agent_client=client)
+        finally:
+            await drain_cleanup()
+            await multi_agent.delete_cached_threads(client)
+            await multi_agent.close_http_client()
+
+
+async def create(ctx: SharedContext) -> None:
+    await ai_agent_create.run(ctx.agent_client)
+
+
+async def existing(ctx: SharedContext) -> None:
+    await ai_agent_existing.run(ctx.agent_client)
+
+
+async def multi(ctx: SharedContext, queries: list[str]) -> None:
+    await multi_agent.run_queries(ctx.agent_client, queries)
+
+
+def serve(host: str, port: int) -> None:
+    """
+    Serve the multi-agent pipeline over HTTP. All requests share one
+    SharedContext; each session_id gets its own conversation thread, which is
+    deleted once the session goes idle or too many sessions are open.
+    """
+    import uvicorn
+    from fastapi import FastAPI, HTTPException
+    from pydantic import BaseModel
+
+    class QueryRequest(BaseModel):
+        query: str
+        session_id: str = "default"
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI):
+        try:
+            async with open_shared_context() as ctx:
+                app.state.ctx = ctx
+                yield
+        finally:
+            await close_credential()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post("/multi")
+    async def multi_endpoint(request: QueryRequest):
+        if multi_agent.is_trivial_query(request.query):
+            raise HTTPException(
+                status_code=422,
+                detail="Query is empty, trivial, or outside the allowed length"
+            )
+        summary = await multi_agent.answer_query(
+            app.state.ctx.agent_client,
+            request.query,
+            request.session_id
+        )
+        return {"summary": summary}
+
+    uvicorn.run(app, host=host, port=port)
+
+
+async def _run_command(args: argparse.Namespace, queries: list[str] | None) -> None:
+    async with open_shared_context() as ctx:
+        if args.command == "create":
+            await create(ctx)
+        elif args.command == "existing":
+            await existing(ctx)
+        else:
+            await multi(ctx, queries)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="pharmacyresearchai")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("create", help="create a temporary agent and ask it a single question")
+    subparsers.add_parser("existing", help="ask an existing agent a single question")
+    multi_parser = subparsers.add_parser("multi", help="run the document, web and summary agent pipeline")
+    multi_parser.add_argument("queries_file", nargs="?", help="file with one query per line (batch mode)")
+    serve_parser = subparsers.add_parser("serve", help="serve the multi-agent pipeline over HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.host, args.port)
+        return
+
+    queries = None
+    if args.command == "multi":
+        # Read (or prompt for) the queries before the event loop starts so input()
+        # does not block it, then reject trivial queries and return previously
+        # computed summaries without opening any Azure client.
+        queries = multi_agent.read_queries(args.queries_file)
+        queries = multi_agent.print_cached_results(multi_agent.drop_trivial_queries(queries))
+        if not queries:
+            return
+    run_main(_run_command(args, queries))
@@ -0,0 +1,749 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import os
+import random
+import shelve
+import sys
+import time
+from collections import OrderedDict
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import quote_plus, urlencode
+
+import httpx
+import orjson
+from dotenv import load_dotenv
+
+from ._azure_shared import azure_sdk, get_credential, run_main, schedule_cleanup, shared_credential, warm_credential
+
+if TYPE_CHECKING:
+    from semantic_kernel.agents.azure_ai import AzureAIAgent
+
+# Load configuration from .env file
+load_dotenv()
+
+# ----- Agent IDs Configuration -----
+# Document Search Agent (Agent 1)
+AGENT1_ID = "xxxxx"
+
+# Web Search Agent (Agent 2)
+AGENT2_ID = "xxxxxx"
+
+# Summary Agent (Agent 3)
+AGENT3_ID = "xxxxxx"
+
+# ----- SERP API and Azure Project Configuration -----
+SERP_API_KEY = os.environ.get("SERP_API_KEY")
+SERP_ENDPOINT = os.environ.get("SERP_ENDPOINT", "https://serpapi.com/search.json")
+PROJECT_CONN_STR = os.environ.get("AZURE_AI_PROJECT_CONNECTION_STRING")
+
+# ----- Query Guard -----
+# Queries that are too short, too long or obviously non-informational are
+# rejected before any SERP call or agent invocation.
+MIN_QUERY_LENGTH = 3
+MAX_QUERY_LENGTH = 2048
+_TRIVIAL_QUERIES = frozenset({"hi", "hello", "test", "?"})
+NO_RESULTS = "No results found."
+
+# SERP API URL prefix with the static query parameters encoded once; only the
+# encoded "q" is appended per call
+SERP_BASE_URL = SERP_ENDPOINT + "?" + urlencode(
+    {"api_key": SERP_API_KEY or "", "location": "TEXAS", "hl": "en"}
+)
+
+# ----- Query Result Cache Configuration -----
+# Summaries are cached by normalized query in an in-memory LRU and, unless
+# RESULT_CACHE_DISK=0, persisted to a shelve file so repeat questions skip the
+# agents and SERP call entirely. Entries expire after RESULT_CACHE_TTL seconds
+# so permit and regulatory answers are not served indefinitely.
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH", ".result_cache")
+RESULT_CACHE_DISK = os.environ.get("RESULT_CACHE_DISK", "1") != "0"
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", "21600"))
+RESULT_CACHE_MAXSIZE = 512
+_RESULT_CACHE: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+# SERP snippets are memoized in memory only, with their own expiry so a
+# regenerated summary is not built from stale web results.
+SERP_CACHE_TTL = int(os.environ.get("SERP_CACHE_TTL", str(RESULT_CACHE_TTL)))
+SERP_CACHE_MAXSIZE = 512
+_SERP_CACHE: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+# ----- Agent Definition Cache Configuration -----
+# Agent definitions rarely change, so they are kept for an hour per process.
+AGENT_DEF_CACHE_TTL = 3600
+_AGENT_DEF_CACHE: dict[str, tuple[float, object]] = {}
+
+# ----- Conversation Thread Cache -----
+# All three agents share one conversation thread, which is reused for the whole
+# session and deleted when the session's agent client is shut down.
+PIPELINE_THREAD_KEY = "pipeline"
+_THREAD_CACHE: dict[str, str] = {}
+_THREAD_LOCKS: dict[str, asyncio.Lock] = {}
+
+# ----- HTTP Session Limits -----
+# Sessions served over HTTP each own a thread; idle or least recently used
+# sessions beyond these limits are evicted and their threads deleted.
+SESSION_IDLE_TTL = int(os.environ.get("SESSION_IDLE_TTL", "1800"))
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", "256"))
+_SESSIONS: OrderedDict[str, float] = OrderedDict()
+_SESSION_IN_FLIGHT: dict[str, int] = {}
+
+# ----- Concurrency and Rate Limits -----
+# Bound concurrent calls to the Azure agent service and SERP API, and space SERP
+# requests out so batched queries stay under the service quotas instead of 429ing.
+AGENT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", "8"))
+SERP_MAX_CONCURRENCY = 4
+SERP_MAX_RPS = 5
+_AGENT_SEM = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+_SERP_SEM = asyncio.Semaphore(SERP_MAX_CONCURRENCY)
+
+
+class RateLimiter:
+    """
+    Enforce a minimum interval between calls so at most `rps` start per second.
+    """
+
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps
+        self.last = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            wait = self.interval - (time.monotonic() - self.last)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.last = time.monotonic()
+
+
+_serp_limiter = RateLimiter(rps=SERP_MAX_RPS)
+
+# ----- Retry Policy -----
+# Rate-limit and transient server errors are retried with exponential backoff;
+# anything else (e.g. authentication failures) is raised immediately.
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Return True if the error looks like a rate limit or transient failure.
+    """
+    from azure.core.exceptions import HttpResponseError
+
+    for e in (error, error.__cause__):
+        if e is None:
+            continue
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in RETRYABLE_STATUS:
+            return True
+        if isinstance(e, HttpResponseError) and e.status_code in RETRYABLE_STATUS:
+            return True
+        # Only network-level transport failures; configuration errors such as
+        # UnsupportedProtocol or ProxyError will not fix themselves on retry.
+        if isinstance(
+            e,
+            (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError, asyncio.TimeoutError)
+        ):
+            return True
+        message = str(e).lower()
+        if "rate limit" in message or "quota" in message:
+            return True
+    return False
+
+
+def is_unsent_request_error(error: BaseException) -> bool:
+    """
+    Return True if the service never acted on the request, so a non-idempotent
+    call such as posting a message or starting a run can be safely repeated:
+    the request was never sent, or it was rejected with 429 before processing.
+    """
+    from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+    for e in (error, error.__cause__):
+        if isinstance(e, (ServiceRequestError, httpx.ConnectError)):
+            return True
+        if isinstance(e, HttpResponseError) and e.status_code == 429:
+            return True
+    return False
+
+
+def describe_error(error: BaseException) -> str:
+    """
+    Describe an error for printing. httpx errors are reduced to their type and
+    status code because their messages include the SERP request URL, which
+    carries the API key; every other error is described by its message.
+    """
+    name = type(error).__name__
+    if isinstance(error, httpx.HTTPError):
+        status = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+        return f"{name} (status {status})" if status else name
+    return str(error) or name
+
+
+async def with_retry(
+    coro_factory,
+    *,
+    retries: int = 3,
+    base: float = 1.0,
+    cap: float = 16.0,
+    retry_if=is_retryable
+):
+    """
+    Await coro_factory(), retrying errors accepted by retry_if up to `retries`
+    times with exponentially growing, jittered waits bounded by `cap` seconds.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await coro_factory()
+        except Exception as e:
+            if attempt == retries or not retry_if(e):
+                raise
+            delay = min(cap, base * 2 ** attempt) + random.random() * 0.5
+            print(f"⚠️ Transient error ({describe_error(e)}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+# ----- Shared HTTP client for SERP API calls -----
+# A single HTTP/2 client is kept for the lifetime of the process so repeated
+# searches are multiplexed over one keep-alive connection instead of paying a
+# new TCP + TLS handshake.
+_HTTP: httpx.AsyncClient | None = None
+_HTTP_LOCK = asyncio.Lock()
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared SERP API client, creating it on first use.
+    """
+    global _HTTP
+    async with _HTTP_LOCK:
+        if _HTTP is None or _HTTP.is_closed:
+            _HTTP = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                # SerpAPI sets no cookies we need, so refuse to store any
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+                headers={"User-Agent": "pharmacyresearchai"}
+            )
+        return _HTTP
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared SERP API client if it was opened.
+    """
+    global _HTTP
+    if _HTTP is not None and not _HTTP.is_closed:
+        await _HTTP.aclose()
+    _HTTP = None
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different spellings share a cache entry.
+    """
+    return query.strip().lower()
+
+
+def is_trivial_query(query: str) -> bool:
+    """
+    Return True if the query is not worth spending SERP quota or agent calls on.
+    """
+    q = query.strip()
+    return (
+        len(q) < MIN_QUERY_LENGTH
+        or len(q) >= MAX_QUERY_LENGTH
+        or q.lower() in _TRIVIAL_QUERIES
+    )
+
+
+def drop_trivial_queries(queries: list[str]) -> list[str]:
+    """
+    Report and remove trivial queries so they never reach the agents.
+    """
+    kept = []
+    for user_query in queries:
+        if is_trivial_query(user_query):
+            print(f"⚠️ Skipping query that is empty, too short, too long or trivial: {user_query[:80]!r}")
+        else:
+            kept.append(user_query)
+    return kept
+
+
+def lru_get(cache: OrderedDict, key: str):
+    """
+    Return a cached value and mark it as most recently used.
+    """
+    if key not in cache:
+        return None
+    cache.move_to_end(key)
+    return cache[key]
+
+
+def lru_put(cache: OrderedDict, key: str, value, maxsize: int) -> None:
+    """
+    Store a value, evicting the least recently used entry when full.
+    """
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def get_cached_result(query: str) -> str | None:
+    """
+    Look up a previous, unexpired summary for the query, in memory first and
+    then on disk.
+    """
+    key = normalize_query(query)
+    entry = lru_get(_RESULT_CACHE, key)
+    if entry is None and RESULT_CACHE_DISK:
+        try:
+            with shelve.open(RESULT_CACHE_PATH) as db:
+                entry = db.get(key)
+        except Exception as e:
+            print(f"❌ Error reading result cache: {e}")
+            return None
+        if isinstance(entry, tuple):
+            lru_put(_RESULT_CACHE, key, entry, RESULT_CACHE_MAXSIZE)
+    # Entries written without a timestamp are treated as expired
+    if not isinstance(entry, tuple):
+        return None
+    stored_at, summary = entry
+    if time.time() - stored_at >= RESULT_CACHE_TTL:
+        _RESULT_CACHE.pop(key, None)
+        return None
+    return summary
+
+
+def cache_result(query: str, result: str) -> None:
+    """
+    Store a timestamped summary for the query in memory and, if enabled, on disk.
+    """
+    key = normalize_query(query)
+    entry = (time.time(), result)
+    lru_put(_RESULT_CACHE, key, entry, RESULT_CACHE_MAXSIZE)
+    if not RESULT_CACHE_DISK:
+        return
+    try:
+        with shelve.open(RESULT_CACHE_PATH) as db:
+            db[key] = entry
+    except Exception as e:
+        print(f"❌ Error writing result cache: {e}")
+
+
+async def search_web(query: str) -> str:
+    """
+    Perform a web search using the SERP API and return a combined snippet summary.
+    Results are memoized per normalized query, for SERP_CACHE_TTL seconds, since
+    they do not depend on the agents. Empty results are not memoized.
+    """
+    if is_trivial_query(query):
+        return NO_RESULTS
+
+    key = normalize_query(query)
+    entry = lru_get(_SERP_CACHE, key)
+    if entry is not None:
+        stored_at, cached = entry
+        if time.monotonic() - stored_at < SERP_CACHE_TTL:
+            return cached
+        _SERP_CACHE.pop(key, None)
+
+    url = f"{SERP_BASE_URL}&q={quote_plus(query)}"
+    http = await get_http_client()
+
+    async def fetch() -> dict:
+        async with _SERP_SEM:
+            await _serp_limiter.acquire()
+            response = await http.get(url)
+            response.raise_for_status()
+            # orjson decodes the raw bytes directly, skipping charset detection
+            return orjson.loads(response.content)
+
+    try:
+        result = await with_retry(fetch)
+    except httpx.HTTPError as e:
+        # Re-raise without the original exception, whose message contains the API key
+        raise RuntimeError(f"SERP API request failed: {describe_error(e)}") from None
+    web_results = "\n".join(
+        snippet
+        for item in result.get("organic_results", ())
+        if (snippet := item.get("snippet"))
+    )
+    if not web_results:
+        return NO_RESULTS
+    lru_put(_SERP_CACHE, key, (time.monotonic(), web_results), SERP_CACHE_MAXSIZE)
+    return web_results
+
+
+async def get_agent_cached(client, agent_id: str):
+    """
+    Return the agent definition for agent_id, fetching it only when not cached
+    or when the cached copy is older than AGENT_DEF_CACHE_TTL.
+    """
+    cached = _AGENT_DEF_CACHE.get(agent_id)
+    if cached is not None and time.monotonic() - cached[0] < AGENT_DEF_CACHE_TTL:
+        return cached[1]
+    definition = await client.agents.get_agent(assistant_id=agent_id)
+    _AGENT_DEF_CACHE[agent_id] = (time.monotonic(), definition)
+    return definition
+
+
+async def get_or_create_thread(client, key: str):
+    """
+    Return the cached conversation thread for key, creating a new one if none
+    is cached or the cached thread no longer exists on the service. Calls are
+    bounded by the global agent concurrency limit.
+    """
+    from azure.core.exceptions import ResourceNotFoundError
+
+    thread_id = _THREAD_CACHE.get(key)
+    if thread_id is not None:
+        try:
+            async with _AGENT_SEM:
+                return await client.agents.get_thread(thread_id)
+        except ResourceNotFoundError:
+            _THREAD_CACHE.pop(key, None)
+    async with _AGENT_SEM:
+        thread = await client.agents.create_thread()
+    _THREAD_CACHE[key] = thread.id
+    return thread
+
+
+def discard_thread(client, key: str) -> None:
+    """
+    Forget the thread cached under key and delete it in the background.
+    """
+    thread_id = _THREAD_CACHE.pop(key, None)
+    if thread_id is not None:
+        schedule_cleanup(client.agents.delete_thread(thread_id))
+
+
+async def delete_cached_threads(client) -> None:
+    """
+    Delete every cached conversation thread, concurrently.
+    """
+    thread_ids = list(_THREAD_CACHE.values())
+    _THREAD_CACHE.clear()
+    results = await asyncio.gather(
+        *(client.agents.delete_thread(thread_id) for thread_id in thread_ids),
+        return_exceptions=True
+    )
+    for thread_id, result in zip(thread_ids, results):
+        if isinstance(result, Exception):
+            print(f"❌ Error deleting thread {thread_id}: {result}")
+
+
+async def _delete_cached_threads_with_new_client() -> None:
+    _, AzureAIAgent, _ = azure_sdk()
+    async with (
+        shared_credential() as creds,
+        AzureAIAgent.create_client(credential=creds) as client,
+    ):
+        await delete_cached_threads(client)
+
+
+@atexit.register
+def _cleanup_threads_at_exit() -> None:
+    # Fallback only: callers normally delete cached threads with their own client
+    # before shutdown, since this needs a new credential and client.
+    if _THREAD_CACHE:
+        run_main(_delete_cached_threads_with_new_client())
+
+
+async def get_agent_response(agent: AzureAIAgent, thread_id: str):
+    """
+    Retrieve an agent's response, bounded by the global agent concurrency limit.
+    Each attempt starts a new run on the thread, so it is only retried when the
+    previous run was never created; otherwise it could collide with a run that
+    is still active or duplicate the assistant's message.
+    """
+    async with _AGENT_SEM:
+        return await with_retry(
+            lambda: agent.get_response(thread_id=thread_id),
+            retry_if=is_unsent_request_error
+        )
+
+
+async def stream_agent_response(agent: AzureAIAgent, thread_id: str) -> str:
+    """
+    Stream an agent's response to stdout as it is generated and return the full
+    text. Not retried: output that has already been printed cannot be taken back.
+    """
+    chunks = []
+    async with _AGENT_SEM:
+        async for chunk in agent.invoke_stream(thread_id=thread_id):
+            if chunk.content:
+                chunks.append(chunk.content)
+                sys.stdout.write(chunk.content)
+                sys.stdout.flush()
+    sys.stdout.write("\n")
+    return "".join(chunks)
+
+
+async def add_message(agent: AzureAIAgent, thread_id: str, message: str) -> None:
+    """
+    Post a chat message to a thread, bounded by the global agent concurrency
+    limit. Posting is not idempotent, so it is only
+    retried when the service never acted on the request; otherwise a lost
+    response would leave a duplicate message on the shared thread.
+    """
+    async with _AGENT_SEM:
+        await with_retry(
+            lambda: agent.add_chat_message(thread_id=thread_id, message=message),
+            retry_if=is_unsent_request_error
+        )
+
+
+async def run_document_agent(document_agent: AzureAIAgent, thread, user_query: str):
+    """
+    Agent 1: send the user's query on the given thread and return the response.
+    """
+    await add_message(document_agent, thread.id, user_query)
+    return await get_agent_response(document_agent, thread.id)
+
+
+async def run_web_agent(web_agent: AzureAIAgent, thread, web_results: str):
+    """
+    Agent 2: pass the SERP API results to the web agent on the given thread and
+    return the response.
+    """
+    await add_message(web_agent, thread.id, f"[WEB_RESULTS]\n{web_results}")
+    return await get_agent_response(web_agent, thread.id)
+
+
+async def load_agents(client):
+    """
+    Return the (document, web, summary) Semantic Kernel agents for the client.
+    """
+    _, AzureAIAgent, _ = azure_sdk()
+
+    # Retrieve pre-created agent definitions for each role (cached, fetched concurrently)
+    document_agent_def, web_agent_def, summary_agent_def = await asyncio.gather(
+        get_agent_cached(client, AGENT1_ID),
+        get_agent_cached(client, AGENT2_ID),
+        get_agent_cached(client, AGENT3_ID)
+    )
+
+    # Instantiate Semantic Kernel agent objects
+    return (
+        AzureAIAgent(client=client, definition=document_agent_def),
+        AzureAIAgent(client=client, definition=web_agent_def),
+        AzureAIAgent(client=client, definition=summary_agent_def),
+    )
+
+
+async def process_query(
+    client,
+    agents,
+    user_query: str,
+    thread_key: str,
+    stream: bool,
+    quiet: bool = False
+) -> str:
+    """
+    Run the document, web and summary agents for one query on the thread cached
+    under thread_key and return the summary. With stream=False the output is
+    printed as one block so concurrent batch queries do not interleave; with
+    quiet=True nothing is printed.
+    """
+    # Queries on the same thread must not overlap: a thread allows one active run.
+    async with _THREAD_LOCKS.setdefault(thread_key, asyncio.Lock()):
+        return await _process_query(client, agents, user_query, thread_key, stream, quiet)
+
+
+async def _process_query(client, agents, user_query: str, thread_key: str, stream: bool, quiet: bool) -> str:
+    document_agent, web_agent, summary_agent = agents
+
+    # Reuse (or create) the conversation thread shared by all three agents
+    thread = await get_or_create_thread(client, thread_key)
+
+    # ----- Agent 1: Document Search Agent -----
+    # A thread allows only one active run at a time, so the agents take turns;
+    # the SERP API search does not touch the thread and runs alongside Agent 1.
+    doc_task = asyncio.ensure_future(run_document_agent(document_agent, thread, user_query))
+    try:
+        web_results = await search_web(user_query)
+    except asyncio.CancelledError:
+        # The run may still be active on the service, so retire the thread
+        # rather than let the next query on this key collide with it.
+        doc_task.cancel()
+        await asyncio.gather(doc_task, return_exceptions=True)
+        discard_thread(client, thread_key)
+        raise
+    except Exception:
+        # Let Agent 1's run finish so it does not outlive the thread lock
+        await asyncio.gather(doc_task, return_exceptions=True)
+        raise
+    response_doc = await doc_task
+    if stream:
+        print("\n[Document Search Agent Response]")
+        print(response_doc)
+
+    # ----- Agent 2: Web Search Agent -----
+    response_web = await run_web_agent(web_agent, thread, web_results)
+    if stream:
+        print("\n[Web Search Agent Response]")
+        print(response_web)
+
+    # ----- Agent 3: Summary Agent -----
+    # The document and web answers are already on the thread, so Agent 3 is
+    # only asked to summarize them rather than being sent them again.
+    await add_message(summary_agent, thread.id, "Summarize the above for the latest query.")
+    if stream:
+        print("\n[Summary Agent Response]")
+        response_summary = await stream_agent_response(summary_agent, thread.id)
+    else:
+        response_summary = str(await get_agent_response(summary_agent, thread.id))
+    if not stream and not quiet:
+        print(
+            f"\n# Query: {user_query}"
+            f"\n\n[Document Search Agent Response]\n{response_doc}"
+            f"\n\n[Web Search Agent Response]\n{response_web}"
+            f"\n\n[Summary Agent Response]\n{response_summary}"
+        )
+    cache_result(user_query, response_summary)
+    # The thread is kept for reuse and deleted at process exit.
+    return response_summary
+
+
+def print_cached_results(queries: list[str]) -> list[str]:
+    """
+    Print previously computed summaries and return the queries that still need
+    to go through the agents.
+    """
+    pending = []
+    for user_query in queries:
+        cached_summary = get_cached_result(user_query)
+        if cached_summary is None:
+            pending.append(user_query)
+            continue
+        if len(queries) > 1:
+            print(f"\n# Query: {user_query}")
+        print("\n[Summary Agent Response (cached)]")
+        print(cached_summary)
+    return pending
+
+
+async def run_queries(client, queries: list[str]) -> None:
+    """
+    Run the pipeline for the given queries. A single query streams its summary
+    to the console; several queries run concurrently, each on its own thread,
+    with the agent and SERP semaphores keeping the fan-out within service limits.
+    """
+    agents = await load_agents(client)
+
+    if len(queries) == 1:
+        await process_query(client, agents, queries[0], PIPELINE_THREAD_KEY, stream=True)
+        return
+
+    results = await asyncio.gather(
+        *(
+            process_query(client, agents, user_query, f"{PIPELINE_THREAD_KEY}-{i}", stream=False)
+            for i, user_query in enumerate(queries)
+        ),
+        return_exceptions=True
+    )
+    for user_query, result in zip(queries, results):
+        if isinstance(result, Exception):
+            print(f"❌ Error processing query '{user_query}': {describe_error(result)}")
+
+
+async def answer_query(client, user_query: str, session_id: str) -> str:
+    """
+    Return the summary for a single query, from the cache when possible.
+    Each session keeps its own conversation thread.
+    """
+    if is_trivial_query(user_query):
+        return NO_RESULTS
+    cached_summary = get_cached_result(user_query)
+    if cached_summary is not None:
+        return cached_summary
+    thread_key = f"{PIPELINE_THREAD_KEY}-{session_id}"
+    # Count the request as in flight before any await so the session cannot be
+    # evicted while it waits for the agents or for the thread lock.
+    _SESSION_IN_FLIGHT[thread_key] = _SESSION_IN_FLIGHT.get(thread_key, 0) + 1
+    try:
+        agents = await load_agents(client)
+        touch_session(client, thread_key)
+        return await process_query(client, agents, user_query, thread_key, stream=False, quiet=True)
+    finally:
+        _SESSION_IN_FLIGHT[thread_key] -= 1
+        if not _SESSION_IN_FLIGHT[thread_key]:
+            del _SESSION_IN_FLIGHT[thread_key]
+
+
+def touch_session(client, thread_key: str) -> None:
+    """
+    Mark a session as used now and evict sessions that have been idle for
+    SESSION_IDLE_TTL seconds or exceed MAX_SESSIONS, deleting their threads in
+    the background. Sessions with a query in flight are never evicted.
+    """
+    now = time.monotonic()
+    _SESSIONS[thread_key] = now
+    _SESSIONS.move_to_end(thread_key)
+    for key, last_used in list(_SESSIONS.items()):
+        if key == thread_key:
+            continue
+        if now - last_used < SESSION_IDLE_TTL and len(_SESSIONS) <= MAX_SESSIONS:
+            break
+        if _SESSION_IN_FLIGHT.get(key):
+            continue
+        del _SESSIONS[key]
+        _THREAD_LOCKS.pop(key, None)
+        discard_thread(client, key)
+
+
+async def main(queries: list[str]):
+    # Reject trivial queries and return previously computed summaries
+    # without contacting any agent.
+    pending = print_cached_results(drop_trivial_queries(queries))
+    if not pending:
+        return
+
+    # Initialize credentials and the Azure AI Projects client
+    AIProjectClient, AzureAIAgent, _ = azure_sdk()
+    credential = get_credential()
+    try:
+        project_client = AIProjectClient.from_connection_string(
+            conn_str=PROJECT_CONN_STR,
+            credential=credential
+        )
+        print("✅ Project client initialized.")
+    except Exception as e:
+        print(f"❌ Error initializing project client: {e}")
+        return
+
+    try:
+        # Fetch a token once before the agent calls below fan out concurrently
+        await warm_credential()
+
+        # Use the async context for proper cleanup of the client; the shared
+        # credential is closed by run_main when the script finishes.
+        async with AzureAIAgent.create_client(credential=credential) as client:
+            try:
+                await run_queries(client, pending)
+            finally:
+                # This script handles one batch per process, so delete the
+                # threads now with the open client rather than at exit.
+                await delete_cached_threads(client)
+    finally:
+        # Close the shared SERP client so its connection pool is released.
+        await close_http_client()
+
+
+def read_queries(path: str | None) -> list[str]:
+    """
+    Read one query per non-empty line of path, or prompt for a single query.
+    """
+    if path:
+        return [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
+    # Prompt the user for a query regarding planning/building permits
+    return [input("Enter your query for planning and building permit info: ")]
+
+
+if __name__ == "__main__":
+    run_main(main(read_queries(sys.argv[1] if len(sys.argv) > 1 else None)))